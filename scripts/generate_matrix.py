@@ -1,3 +1,4 @@
+import functools
 import json
 import os
 import re
@@ -5,6 +6,9 @@ from collections import defaultdict
 
 import requests
 
+SESSION = requests.Session()
+SESSION.headers.update({"User-Agent": "python-requests"})
+
 DOCKER_TAGS_API = "https://hub.docker.com/v2/repositories/nvidia/cuda/tags/"
 PYTORCH_WHL_INDEX = "https://download.pytorch.org/whl/torch/"
 _JIMVER_CUDA_TOOLKIT_VERSION = os.getenv("JIMVER_CUDA_TOOLKIT_VERSION", "v0.2.35")
@@ -23,9 +27,13 @@ def get_latest_cuda_patches_for_ubuntu2204() -> dict[str, str]:
     latest_patch: dict[str, int] = {}  # key: "major.minor" -> max patch int
 
     while url:
-        resp = requests.get(url, params=params).json()
+        resp = SESSION.get(url, params=params).json()
         for item in resp.get("results", []):
             name = item.get("name", "")
+            # Cheap substring check first; most tags (runtime-*, base-*, ...)
+            # can be rejected without running the regex at all.
+            if "-devel-ubuntu22.04" not in name:
+                continue
             m = tag_re.match(name)
             if not m:
                 continue
@@ -72,7 +80,7 @@ def get_target_versions() -> tuple[list[str], list[str]]:
 
 
 def fetch_html(url: str) -> str:
-    r = requests.get(url, timeout=30, headers={"User-Agent": "python-requests"})
+    r = SESSION.get(url, timeout=30)
     r.raise_for_status()
     return r.text
 
@@ -107,6 +115,12 @@ def parse_torch_version_and_cuda(filename: str) -> tuple[str, str] | None:
     return m.group(1), m.group(2)
 
 
+@functools.lru_cache(maxsize=32)
+def ver2tuple(ver: str) -> tuple[int, ...]:
+    """Parse '2.8.0' into (2, 8, 0); memoized since the same few versions recur."""
+    return tuple(map(int, ver.split(".")))
+
+
 def build_pytorch_cuda_table() -> dict[str, dict[str, set[str]]]:
     """
     Build table: platform -> torch_version -> {cuda_versions}
@@ -128,7 +142,7 @@ def build_pytorch_cuda_table() -> dict[str, dict[str, set[str]]]:
 
         torch_ver, cuda_tag = parsed
 
-        torch_ver_tuple = tuple(map(int, torch_ver.split(".")))
+        torch_ver_tuple = ver2tuple(torch_ver)
         cuda_ver_tuple = (int(cuda_tag[2:4]), int(cuda_tag[4:]))
 
         if torch_ver_tuple < (2, 8, 0) or cuda_ver_tuple < (12, 6):
@@ -144,8 +158,9 @@ def build_pytorch_cuda_table() -> dict[str, dict[str, set[str]]]:
 def write_github_output(matrix_json: str) -> None:
     if "GITHUB_OUTPUT" not in os.environ:
         return
-    with open(os.environ["GITHUB_OUTPUT"], "a") as f:
-        f.write(f"matrix<<EOF\n{matrix_json}\nEOF\n")
+    payload = f"matrix<<EOF\n{matrix_json}\nEOF\n".encode("utf-8")
+    with open(os.environ["GITHUB_OUTPUT"], "ab") as f:
+        f.write(payload)
 
 
 def main() -> None:
@@ -161,11 +176,14 @@ def main() -> None:
     pytorch_table = build_pytorch_cuda_table()
     target_filter = pytorch_table.get(target, {})
 
+    missing = {v.strip() for v in cuda_versions} - cuda_full_map.keys()
+    if missing:
+        raise RuntimeError(f"Unavailable CUDA versions: {sorted(missing)}")
+
     matrix = {"include": []}
 
     for cuda in cuda_versions:
         cuda = cuda.strip()
-        assert cuda in cuda_full_map
         cuda_full = cuda_full_map[cuda]
 
         for torch in torch_versions:
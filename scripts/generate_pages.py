@@ -4,27 +4,154 @@ import json
 import os
 import re
 import shutil
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime
+from operator import attrgetter
 from pathlib import Path
 from typing import Dict, List, Tuple
 
 import jinja2
 import requests
 
+try:
+    import orjson
+except ImportError:  # 可选依赖，缺了就退回stdlib json
+    orjson = None
+
 TEMPLATES_DIR = Path(__file__).parent.parent / "templates"
 
 WHEEL_RE = re.compile(
-    r"flash_attn_3-(?P<base>\d+\.\d+\.\d+(?:[a-zA-Z]+\d*)?)"  # 3.0.0b1
-    r"[.+](?P<date>\d{8})"  # 20250907
-    r"[.+]cu(?P<cuda>\d{3})"  # 129
-    r"torch(?P<torch>\d{3,4})"  # 280/2100
-    r"cxx11abi(?P<abi>true|false)"  # true
+    r"\Aflash_attn_3-(\d+\.\d+\.\d+(?:[a-zA-Z]+\d*)?)"  # 3.0.0b1
+    r"[.+](\d{8})"  # 20250907
+    r"[.+]cu(\d{3})"  # 129
+    r"torch(\d{3,4})"  # 280/2100
+    r"cxx11abi(true|false)"  # true
     r"[.+][a-f0-9]+"  # dfb664
-    r"-cp(?P<py>\d{2})-.+-(?P<platform>[a-z0-9_]+)\.whl",  # cp39-abi3-linux_x86_64.whl
-    re.I,
+    r"-cp(\d{2})-.+-([a-z0-9_]+)\.whl\Z",  # cp39-abi3-linux_x86_64.whl
 )
 
 CACHE_FILE = "download_stats.json"
+RELEASES_CACHE_FILE = ".releases_cache.json"
+
+@dataclass(slots=True, frozen=True)
+class Wheel:
+    """单个wheel在索引页里需要的全部字段"""
+
+    filename: str
+    download_url: str
+    size: int
+    python_version: str
+    build_date: str
+    release_date: str
+    cuda_version: str
+    torch_version: str
+
+
+WheelInfo = namedtuple(
+    "WheelInfo",
+    [
+        "filename",
+        "base_version",
+        "build_date",
+        "cuda_version",
+        "torch_version",
+        "cxx11_abi",
+        "python_version",
+        "platform",
+    ],
+)
+
+# Bound method cached at module scope so the hot asset loop pays neither the
+# attribute lookup nor the named-group dict access per call.
+_match_wheel = WHEEL_RE.match
+
+
+def _response_json(response: requests.Response):
+    """解析API响应：有orjson就用（大release数组快2-3倍），否则用stdlib"""
+    if orjson is not None:
+        return orjson.loads(response.content)
+    return response.json()
+
+
+def _parse_wheel_fast(filename: str) -> WheelInfo | None:
+    """以固定格式直接切片解析wheel文件名，比正则引擎快。
+
+    只认标准的 '+' 本地版本布局；任何不符合的文件名返回None，
+    由 WHEEL_RE 兜底。
+    """
+    if not (filename.startswith("flash_attn_3-") and filename.endswith(".whl")):
+        return None
+    stem = filename[13:-4]
+    base, sep, local = stem.partition("+")
+    if not sep or base.count(".") != 2 or not base[0].isdigit():
+        return None
+
+    # local: 20250907 . cu129torch280cxx11abitrue . dfb664-cp39-abi3-linux_x86_64
+    pieces = local.split(".")
+    if len(pieces) != 3:
+        return None
+    date, combo, tail = pieces
+    if len(date) != 8 or not date.isdigit():
+        return None
+
+    if not combo.startswith("cu"):
+        return None
+    torch_at = combo.find("torch", 2)
+    abi_at = combo.find("cxx11abi", torch_at + 5) if torch_at != -1 else -1
+    if abi_at == -1:
+        return None
+    cuda = combo[2:torch_at]
+    torch = combo[torch_at + 5 : abi_at]
+    abi = combo[abi_at + 8 :]
+    if not (
+        len(cuda) == 3
+        and cuda.isdigit()
+        and 3 <= len(torch) <= 4
+        and torch.isdigit()
+        and abi in ("true", "false")
+    ):
+        return None
+
+    segments = tail.split("-")
+    if len(segments) < 4:
+        return None
+    py_tag = segments[1]
+    platform = segments[-1]
+    if not (len(py_tag) == 4 and py_tag.startswith("cp") and py_tag[2:].isdigit()):
+        return None
+
+    return WheelInfo(
+        filename=filename,
+        base_version=base,
+        build_date=date,
+        cuda_version=cuda,
+        torch_version=torch,
+        cxx11_abi=abi,
+        python_version=f"{py_tag[2]}.{py_tag[3:]}",
+        platform=platform,
+    )
+
+
+def parse_wheel_info(filename: str) -> WheelInfo | None:
+    info = _parse_wheel_fast(filename)
+    if info is not None:
+        return info
+    m = _match_wheel(filename)
+    if m is None:
+        return None
+    base, date, cuda, torch, abi, py, platform = m.groups()
+    return WheelInfo(
+        filename=filename,
+        base_version=base,  # 3.0.0b1
+        build_date=date,  # 20250907
+        cuda_version=cuda,  # 129
+        torch_version=torch,  # 280/2100
+        cxx11_abi=abi,  # true / false
+        python_version=f"{py[0]}.{py[1:]}",  # 310 -> 3.10
+        platform=platform,  # linux_x86_64, win_amd64, linux_aarch64
+    )
 
 
 class WheelIndexGenerator:
@@ -33,6 +160,9 @@ class WheelIndexGenerator:
         self.repo_name = repo_name
         self.token = token
         self.base_url = f"https://api.github.com/repos/{repo_owner}/{repo_name}"
+        # 页面里反复引用的两个URL前缀，一次拼好
+        self.pages_base = f"https://{repo_owner}.github.io/{repo_name}"
+        self.github_url = f"https://github.com/{repo_owner}/{repo_name}"
         self.headers = {}
         self.download_stats = {
             "file_stats": [],
@@ -41,19 +171,64 @@ class WheelIndexGenerator:
             "daily_new_stats": [],
         }
         self.yesterday_stats = {"file_stats": [], "total_downloads": 0}
+        self.releases_cache = {}
         if token:
             self.headers["Authorization"] = f"token {token}"
+        # One session for all API calls: reuses the TCP+TLS connection across
+        # paginated requests instead of handshaking per page.
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
         self.jinja_env = jinja2.Environment(
             loader=jinja2.FileSystemLoader(str(TEMPLATES_DIR)),
             autoescape=True,
+            auto_reload=False,
         )
+        # 模板编译一次，渲染方法直接复用
+        self.main_template = self.jinja_env.get_template("index.html.j2")
+        self.simple_template = self.jinja_env.get_template("simple_index.html.j2")
 
     def get_releases(self) -> List[Dict]:
-        """获取所有release"""
-        url = f"{self.base_url}/releases"
-        response = requests.get(url, headers=self.headers)
+        """获取所有release：第一页揭示总页数后，其余页并发抓取
+
+        带上一次运行的ETag做条件请求；304时直接复用缓存的release列表，
+        不消耗带宽也不占rate limit。
+        """
+        url = f"{self.base_url}/releases?per_page=100"
+        headers = {}
+        if self.releases_cache.get("etag") and "releases" in self.releases_cache:
+            headers["If-None-Match"] = self.releases_cache["etag"]
+        response = self.session.get(url, headers=headers)
+        if response.status_code == 304:
+            print("Release list unchanged (ETag match), using cached copy")
+            return self.releases_cache["releases"]
         response.raise_for_status()
-        return response.json()
+        releases: List[Dict] = list(_response_json(response))
+
+        last_url = response.links.get("last", {}).get("url")
+        if not last_url:
+            self.releases_cache = {
+                "etag": response.headers.get("ETag"),
+                "releases": releases,
+            }
+            return releases
+
+        last_page = int(re.search(r"[?&]page=(\d+)", last_url).group(1))
+        page_urls = [f"{url}&page={page}" for page in range(2, last_page + 1)]
+
+        def fetch(page_url: str) -> List[Dict]:
+            r = self.session.get(page_url)
+            r.raise_for_status()
+            return _response_json(r)
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            for page in executor.map(fetch, page_urls):
+                releases.extend(page)
+
+        self.releases_cache = {
+            "etag": response.headers.get("ETag"),
+            "releases": releases,
+        }
+        return releases
 
     def load_cached_stats(self, output_dir: str):
         """Load yesterday's stats from cache file"""
@@ -123,110 +298,153 @@ class WheelIndexGenerator:
             json.dump(self.download_stats, f, indent=2)
         print(f"Saved stats to {cache_path}")
 
-    def parse_wheel_info(self, filename: str) -> dict | None:
-        m = WHEEL_RE.match(filename)
-        if not m:
-            return None
-        return {
-            "filename": filename,
-            "base_version": m["base"],
-            "build_date": m["date"],
-            "cuda_version": m["cuda"],  # 12.3
-            "torch_version": m["torch"],  # 2.4.0
-            "cxx11_abi": m["abi"],  # TRUE / FALSE
-            "python_version": f"{m['py'][0]}.{m['py'][1:]}",  # 310 -> 3.10
-            "platform": m["platform"],  # linux_x86_64, win_amd64, linux_aarch64
-        }
+    def load_releases_cache(self, output_dir: str):
+        """Load the previous run's release list and its ETag"""
+        cache_path = Path(output_dir) / RELEASES_CACHE_FILE
+        if cache_path.exists():
+            try:
+                with open(cache_path) as f:
+                    self.releases_cache = json.load(f)
+                print(f"Loaded releases cache from {cache_path}")
+            except Exception as e:
+                print(f"Failed to load releases cache: {e}")
+
+    def save_releases_cache(self, output_dir: str):
+        """Save the release list for next run's conditional request"""
+        cache_path = Path(output_dir) / RELEASES_CACHE_FILE
+        with open(cache_path, "w") as f:
+            json.dump(self.releases_cache, f)
 
     def organize_wheels(self, releases: List[Dict]) -> Dict:
         """按CUDA和PyTorch版本组织wheels"""
         organized = {}
+        # 局部变量比全局名字查找更快，资产循环里每次都要用
+        parse = parse_wheel_info
 
         for release in releases:
             release_date = release["published_at"][:10]
             for asset in release["assets"]:
-                if asset["name"].endswith(".whl"):
-                    info = self.parse_wheel_info(asset["name"])
-                    if info:
-                        cuda_ver = info["cuda_version"]
-                        torch_ver = info["torch_version"]
-
-                        key = (
-                            (int(cuda_ver[:2]), int(cuda_ver[2:])),
-                            (
-                                int(torch_ver[:1]),
-                                int(torch_ver[1:-1]),
-                                int(torch_ver[-1:]),
-                            ),
-                        )
-                        if key not in organized:
-                            organized[key] = {
-                                "wheels": [],
-                                "tags": set(),
-                                "index_name": f"cu{cuda_ver}_torch{torch_ver}",
-                            }
-
-                        organized[key]["wheels"].append(
-                            {
-                                "filename": info["filename"],
-                                "download_url": asset["browser_download_url"],
-                                "size": asset["size"],
-                                "created_at": asset["created_at"],
-                                "python_version": info["python_version"],
-                                "flash_version": info["base_version"],
-                                "release_date": release_date,
-                                "cuda_version": cuda_ver,
-                                "torch_version": torch_ver,
-                            }
-                        )
-
-                        # 检测平台标签
-                        platform = info["platform"]
-                        if "win" in platform:
-                            organized[key]["tags"].add("windows")
-                        elif "aarch64" in platform or "arm64" in platform:
-                            organized[key]["tags"].add("arm64")
+                name = asset["name"]
+                # 先做廉价的前后缀检查，避免对无关资产跑正则
+                if not (name.startswith("flash_attn_3-") and name.endswith(".whl")):
+                    continue
+                info = parse(name)
+                if not info:
+                    continue
+
+                cuda_ver = info.cuda_version
+                torch_ver = info.torch_version
+
+                key = (
+                    (int(cuda_ver[:2]), int(cuda_ver[2:])),
+                    (
+                        int(torch_ver[:1]),
+                        int(torch_ver[1:-1]),
+                        int(torch_ver[-1:]),
+                    ),
+                )
+                # defaultdict在这里不合适（组的元数据由key推导），
+                # 用get+局部变量把每资产的多次dict查找压缩成一次
+                group = organized.get(key)
+                if group is None:
+                    group = organized[key] = {
+                        "wheels": [],
+                        "tags": set(),
+                        "index_name": f"cu{cuda_ver}_torch{torch_ver}",
+                        "cuda_ver": f"{cuda_ver[:2]}.{cuda_ver[2:]}",
+                        "torch_ver": (
+                            f"{torch_ver[:1]}.{torch_ver[1:-1]}.{torch_ver[-1:]}"
+                        ),
+                        "wheel_count": 0,
+                        "last_updated": "",
+                    }
+
+                group["wheels"].append(
+                    Wheel(
+                        filename=info.filename,
+                        download_url=asset["browser_download_url"],
+                        size=asset["size"],
+                        python_version=info.python_version,
+                        build_date=info.build_date,
+                        release_date=release_date,
+                        cuda_version=cuda_ver,
+                        torch_version=torch_ver,
+                    )
+                )
+                group["wheel_count"] += 1
+                if release_date > group["last_updated"]:
+                    group["last_updated"] = release_date
+
+                # 检测平台标签
+                platform = info.platform
+                if platform.startswith("win"):
+                    group["tags"].add("windows")
+                elif "aarch64" in platform or "arm64" in platform:
+                    group["tags"].add("arm64")
+
+        # 每组只排一次序，渲染时直接用；按已解析的短键排，
+        # 比整个文件名逐字符比较便宜，且新构建排在最前
+        sort_key = attrgetter("build_date", "python_version", "filename")
+        for group in organized.values():
+            group["wheels"].sort(key=sort_key, reverse=True)
 
         return organized
 
-    def generate_simple_index(
-        self, wheels: List[Dict], cuda_version: Tuple[int], torch_version: Tuple[int]
-    ) -> str:
-        """生成简单的HTML index页面"""
-        template = self.jinja_env.get_template("simple_index.html.j2")
-        return template.render(
-            cuda_version=".".join(map(str, cuda_version)),
-            torch_version=".".join(map(str, torch_version)),
+    def write_simple_index(
+        self,
+        path: Path,
+        wheels: List[Wheel],
+        cuda_version: str,
+        torch_version: str,
+        now: str,
+    ) -> None:
+        """流式生成简单的HTML index页面，边渲染边写盘"""
+        fragments = self.simple_template.generate(
+            cuda_version=cuda_version,
+            torch_version=torch_version,
             wheels=wheels,
-            now=datetime.now().strftime("%Y-%m-%d %H:%M:%S UTC"),
+            now=now,
         )
+        with path.open("w", encoding="utf-8", buffering=65536) as f:
+            f.writelines(fragments)
+
+    def write_json_index(self, path: Path, wheels: List[Wheel]) -> None:
+        """生成PEP 691风格的JSON索引，现代pip客户端可跳过HTML解析"""
+        doc = {
+            "meta": {"api-version": "1.0"},
+            "files": [
+                {"filename": w.filename, "url": w.download_url, "size": w.size}
+                for w in wheels
+            ],
+        }
+        if orjson is not None:
+            path.write_bytes(orjson.dumps(doc))
+        else:
+            path.write_text(json.dumps(doc, separators=(",", ":")), encoding="utf-8")
 
-    def generate_main_index(self, organized_wheels: Dict) -> str:
+    def generate_main_index(self, organized_wheels: Dict, now: str) -> str:
         """生成主index页面"""
-        template = self.jinja_env.get_template("index.html.j2")
         wheel_groups = []
         for key, group in sorted(organized_wheels.items(), reverse=True):
             wheels = group["wheels"]
             if not wheels:
                 continue
             tags = group["tags"]
-            cudaver = wheels[0]["cuda_version"]
-            torch_ver = wheels[0]["torch_version"]
             wheel_groups.append(
                 {
                     "index_name": group["index_name"],
-                    "cuda_ver": f"{cudaver[:2]}.{cudaver[2:]}",
-                    "torch_ver": f"{torch_ver[:1]}.{torch_ver[1:-1]}.{torch_ver[-1:]}",
-                    "wheel_count": len(wheels),
-                    "last_updated": max(w["release_date"] for w in wheels),
+                    "cuda_ver": group["cuda_ver"],
+                    "torch_ver": group["torch_ver"],
+                    "wheel_count": group["wheel_count"],
+                    "last_updated": group["last_updated"],
                     "has_windows": "windows" in tags,
                     "has_arm64": "arm64" in tags,
                 }
             )
-        return template.render(
-            repo_owner=self.repo_owner,
-            repo_name=self.repo_name,
-            now=datetime.now().strftime("%Y-%m-%d %H:%M:%S UTC"),
+        return self.main_template.render(
+            pages_base=self.pages_base,
+            github_url=self.github_url,
+            now=now,
             download_stats=self.download_stats,
             wheel_groups=wheel_groups,
         )
@@ -237,6 +455,7 @@ class WheelIndexGenerator:
         output_path.mkdir(parents=True, exist_ok=True)
 
         self.load_cached_stats(output_dir)
+        self.load_releases_cache(output_dir)
 
         print("Fetching releases from GitHub...")
         releases = self.get_releases()
@@ -247,15 +466,21 @@ class WheelIndexGenerator:
         organized_wheels = self.organize_wheels(releases)
 
         self.save_stats(output_dir)
-        # Copy favicon
+        self.save_releases_cache(output_dir)
+        # Copy favicon 和共享的追踪脚本
         shutil.copy(TEMPLATES_DIR / "favicon.svg", output_path / "favicon.svg")
+        shutil.copy(TEMPLATES_DIR / "clarity.js", output_path / "clarity.js")
+
+        # 生成时间戳只计算一次，所有页面共用
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S UTC")
 
         # 生成主索引页面
         print("Generating main index page...")
-        main_index = self.generate_main_index(organized_wheels)
-        (output_path / "index.html").write_text(main_index)
+        main_index = self.generate_main_index(organized_wheels, now)
+        (output_path / "index.html").write_text(main_index, encoding="utf-8")
 
-        # 为每个组合生成索引页面
+        # 为每个组合生成索引页面：页面相互独立，并发写盘
+        tasks = []
         for key, group in organized_wheels.items():
             wheels = group["wheels"]
             if not wheels:
@@ -265,16 +490,27 @@ class WheelIndexGenerator:
 
             print(f"Generating index page for {index_name}...")
 
-            cuda_version, torch_version = key
             # 创建子目录
             subdir = output_path / index_name
             subdir.mkdir(exist_ok=True)
 
-            # 生成索引页面
-            index_content = self.generate_simple_index(
-                wheels, cuda_version, torch_version
+            tasks.append(
+                (
+                    subdir / "index.html",
+                    wheels,
+                    group["cuda_ver"],
+                    group["torch_ver"],
+                )
             )
-            (subdir / "index.html").write_text(index_content)
+
+        def write_combo_indexes(task):
+            path, wheels, cuda_ver, torch_ver = task
+            self.write_simple_index(path, wheels, cuda_ver, torch_ver, now)
+            self.write_json_index(path.with_name("index.v1_json"), wheels)
+
+        if tasks:
+            with ThreadPoolExecutor(max_workers=min(32, len(tasks))) as executor:
+                list(executor.map(write_combo_indexes, tasks))
 
         print(f"All pages generated in {output_dir}")
 